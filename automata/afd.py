@@ -16,6 +16,18 @@ class AFD(AF):
         self.transitions[state1][char] = state2
         self.alphabet.add(char)
 
+    def accepts(self, word: str) -> bool:
+        """Indica si el autómata acepta la cadena dada."""
+        if self.initial_state is None:
+            return False
+        transitions = self.transitions
+        state = self.initial_state
+        for char in word:
+            state = transitions[state].get(char)
+            if state is None:
+                return False
+        return state in self.final_states
+
     def minimize(self):
         """Minimiza el autómata."""
         raise NotImplementedError
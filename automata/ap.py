@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from tabulate import tabulate
 from typing import Hashable, Union
 
@@ -21,9 +22,23 @@ class AP(ABC):
         self.final_states = set()
         # Formato: {(estado, símbolo_entrada, símbolo_pila): [(nuevo_estado, cadena_pila)]}
         self.transitions = {}
+        # Índice de las transiciones por estado origen:
+        # {estado: {símbolo_pila: {símbolo_entrada: (nuevo_estado, cadena_pila)}}}
+        self._by_source = defaultdict(lambda: defaultdict(dict))
+        # Y por estado destino: {estado: {(estado_origen, símbolo_entrada, símbolo_pila), ...}}
+        # Solo lo usa el renombre de estados, así que se arma recién la primera vez que
+        # hace falta (ver APD._get_by_target); hasta entonces es None.
+        self._by_target = None
         self.input_alphabet = set()  # Alfabeto de entrada
         self.stack_alphabet = set()  # Alfabeto de pila
         self.initial_stack_symbol = SpecialStackSymbol.EMPTY  # Símbolo inicial de pila
+        # Las clases derivadas pueden precalcular estructuras a partir del autómata
+        # (ver APD.freeze); cualquier modificación las invalida.
+        self._frozen = False
+        # Versión del autómata, se incrementa con cada modificación
+        self._tx_version = 0
+        self._table_cache = None  # (versión, tabla) de la última transitions_table()
+        self._sorted_states_cache = None  # estados ordenados para transitions_table()
 
     def size(self):
         """Devuelve la cantidad de estados del autómata."""
@@ -39,17 +54,23 @@ class AP(ABC):
         self.states.add(state)
         if final:
             self.final_states.add(state)
+        self._sorted_states_cache = None
+        # lo mismo que _invalidate, sin la llamada
+        self._frozen = False
+        self._tx_version += 1
 
     def mark_initial_state(self, state: Hashable):
         """Marca un estado del autómata como inicial."""
         if state not in self.states:
             raise ValueError(f"El estado {state} no pertenece al autómata.")
         self.initial_state = state
+        self._invalidate()
 
     def set_initial_stack_symbol(self, symbol: str):
         """Define el símbolo inicial de la pila."""
         self.initial_stack_symbol = symbol
         self.stack_alphabet.add(symbol)
+        self._invalidate()
 
     def normalize_states(self):
         """
@@ -64,20 +85,39 @@ class AP(ABC):
             if state not in new_names:
                 new_names[state] = f"q{i + 1}"
 
-        # Ordenamos los estados para hacer el renombre sin pisar ninguno
+        # Ordenamos los estados para hacer el renombre sin pisar ninguno.
+        # Como el renombre es inyectivo, el grafo viejo -> nuevo es una unión de caminos
+        # y ciclos: cada camino se renombra desde el final hacia el principio, y en cada
+        # ciclo uno de los estados pasa primero por un nombre temporal.
         ordered_new_names = []
-        while len(new_names) > 0:
-            for old_name, new_name in new_names.items():
-                if old_name == new_name or new_name not in new_names.keys():
-                    ordered_new_names.append([old_name, new_name, False])
-                    del new_names[old_name]
-                    break
-            else:
-                # Detectamos un loop entre las operaciones de renombre
-                # Hay que usar un nombre temporal
-                old_name, new_name = next(iter(new_names.items()))
-                ordered_new_names.append([old_name, new_name, True])
-                del new_names[old_name]
+        pending = set(new_names)
+        targets = set(new_names.values())
+        for head in new_names:
+            if head in targets:
+                continue
+            chain = [head]
+            while new_names[chain[-1]] in new_names:
+                chain.append(new_names[chain[-1]])
+            for old_name in reversed(chain):
+                ordered_new_names.append([old_name, new_names[old_name], False])
+                pending.discard(old_name)
+
+        # Lo que queda son ciclos (incluyendo estados que no cambian de nombre)
+        for start in new_names:
+            if start not in pending:
+                continue
+            cycle = [start]
+            while new_names[cycle[-1]] != start:
+                cycle.append(new_names[cycle[-1]])
+            pending.difference_update(cycle)
+            if len(cycle) == 1:
+                ordered_new_names.append([start, start, False])
+                continue
+            # Detectamos un loop entre las operaciones de renombre
+            # Hay que usar un nombre temporal
+            ordered_new_names.append([start, new_names[start], True])
+            for old_name in reversed(cycle[1:]):
+                ordered_new_names.append([old_name, new_names[old_name], False])
 
         # Realizamos el renombre
         for old_name, new_name, use_temp in ordered_new_names:
@@ -103,12 +143,17 @@ class AP(ABC):
         """
         if not self.transitions:
             return "No hay transiciones definidas."
+        # Si el autómata no cambió desde la última vez, devolvemos la misma tabla
+        if self._table_cache is not None and self._table_cache[0] == self._tx_version:
+            return self._table_cache[1]
 
         # Agrupar transiciones por estado origen
-        state_transitions = {}
+        state_transitions = defaultdict(list)
         for (state, input_sym, stack_sym), targets in self.transitions.items():
-            if state not in state_transitions:
-                state_transitions[state] = []
+            # La parte (símbolo_entrada, símbolo_pila) depende solo de la clave
+            input_str = input_sym if input_sym else SpecialStackSymbol.LAMBDA
+            stack_sym_str = stack_sym if stack_sym else SpecialStackSymbol.LAMBDA
+            prefix = f"({input_str}, {stack_sym_str}) → "
             
             # Separamos en dos casos:
             # - APD: guarda targets como tupla directa (estado, pila)
@@ -116,26 +161,17 @@ class AP(ABC):
             # igual creo no necesito el APND
             if isinstance(targets, tuple) and len(targets) == 2 and isinstance(targets[1], str):
                 # Caso 1: APD - targets es directamente (new_state, stack_string)
-                new_state, stack_string = targets
+                targets = (targets,)
+            # Caso 2: APND - targets es una colección de tuplas
+            for new_state, stack_string in targets:
                 stack_str = stack_string if stack_string else SpecialStackSymbol.LAMBDA
-                input_str = input_sym if input_sym else SpecialStackSymbol.LAMBDA
-                stack_sym_str = stack_sym if stack_sym else SpecialStackSymbol.LAMBDA
-                state_transitions[state].append(
-                    f"({input_str}, {stack_sym_str}) → ({new_state}, {stack_str})"
-                )
-            else:
-                # Caso 2: APND - targets es una colección de tuplas
-                for new_state, stack_string in targets:
-                    stack_str = stack_string if stack_string else SpecialStackSymbol.LAMBDA
-                    input_str = input_sym if input_sym else SpecialStackSymbol.LAMBDA
-                    stack_sym_str = stack_sym if stack_sym else SpecialStackSymbol.LAMBDA
-                    state_transitions[state].append(
-                        f"({input_str}, {stack_sym_str}) → ({new_state}, {stack_str})"
-                    )
+                state_transitions[state].append(f"{prefix}({new_state}, {stack_str})")
 
         # Crear tabla con los estados y sus transiciones
+        if self._sorted_states_cache is None:
+            self._sorted_states_cache = sorted(self.states, key=str)
         table = []
-        for state in sorted(self.states, key=str):
+        for state in self._sorted_states_cache:
             # Marcar estado inicial (^) y finales (*)
             state_marker = ""
             if state == self.initial_state:
@@ -146,7 +182,9 @@ class AP(ABC):
             transitions_str = "\n".join(state_transitions.get(state, ["-"]))
             table.append([f"{state}{state_marker}", transitions_str])
 
-        return tabulate(table, headers=["Estado", "Transiciones δ(q, a, X)"], tablefmt="fancy_grid")
+        rendered = tabulate(table, headers=["Estado", "Transiciones δ(q, a, X)"], tablefmt="fancy_grid")
+        self._table_cache = (self._tx_version, rendered)
+        return rendered
 
     def __str__(self):
         """Imprimirr el autómata."""
@@ -170,6 +208,13 @@ class AP(ABC):
                 self.final_states.add(new_name)
             #  hay que renombrar también en las transiciones
             self._rename_state_in_transitions(old_name, new_name)
+            self._sorted_states_cache = None
+            self._invalidate()
+
+    def _invalidate(self):
+        """Descarta las estructuras precalculadas luego de modificar el autómata."""
+        self._frozen = False
+        self._tx_version += 1
 
     @abstractmethod
     def _rename_state_in_transitions(self, old_name: Hashable, new_name: Hashable):
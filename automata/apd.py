@@ -1,9 +1,20 @@
+from array import array
+from collections import defaultdict
+from functools import lru_cache
 from typing import Hashable, Union, Optional
+from automata.afd import AFD
 from automata.ap import AP, SpecialStackSymbol
 
 
 __all__ = ["APD"]
 SIMBOLO_LAMBDA = None
+# Modos de aceptación de accepts, como enteros para _accepts_core
+_ACCEPTANCE_MODES = {"final_state": 0, "empty_stack": 1}
+# Cantidad de resultados de accepts que se recuerdan por autómata
+_ACCEPTS_CACHE_SIZE = 4096
+# accepts congela el autómata recién cuando los símbolos leídos desde la última
+# modificación superan esta cantidad por cada transición o estado (ver accepts)
+_FREEZE_WORK_PER_ELEMENT = 8
 
 class APD(AP):
     """Autómata de Pila Determinístico."""
@@ -12,6 +23,22 @@ class APD(AP):
         super().__init__()
         # Formato: {(estado, input, stack_top): (new_state, stack_string)}
         self.transitions = {}
+        # Cadenas de transiciones lambda que solo reemplazan el tope (ver _lambda_chain_end):
+        # {(estado, tope): (estado, tope) donde termina la cadena, o None si es un ciclo}
+        self._eps_cache = {}
+        # Y al revés, de qué pares se llega a cada (estado, tope) con una de esas transiciones
+        self._eps_pred = defaultdict(set)
+        # Ids enteros de estados y símbolos. freeze asigna los que falten y nunca cambia
+        # los ya asignados. El id 0 de entrada es lambda.
+        self._state_ids = {}
+        self._input_ids = {SIMBOLO_LAMBDA: 0}
+        self._stack_ids = {}
+        # Cadenas a apilar ya separadas en tope nuevo y resto (ver freeze), se
+        # conservan entre congelamientos: {(typecode, cadena_pila): (tope, resto)}
+        self._push_splits = {}
+        # Símbolos leídos por accepts sin congelar, desde la versión _unfrozen_version
+        self._unfrozen_work = 0
+        self._unfrozen_version = None
 
     def add_transition(self, state: Hashable, new_state: Hashable,
                       input_symbol: Optional[str], stack_top: str,
@@ -40,9 +67,10 @@ class APD(AP):
         #key.add(state)
         #key.add(input_symbol)
         #key.add(stack_top)
+        by_input = self._by_source[state][stack_top]
         
         # chequear que no existe ya una transición para esta clave
-        if key in self.transitions:
+        if input_symbol in by_input:
             raise ValueError(
                 f"Ya existe una transición para ({state}, {input_symbol or SIMBOLO_LAMBDA}, {stack_top}). "
                 f"El autómata no sería determinístico."
@@ -51,31 +79,91 @@ class APD(AP):
         # chequear que no hay conflicto con transiciones lambda
         # para que siga siendo deterministico
         if input_symbol is not None:
-            epsilon_key = (state, None, stack_top)
-            if epsilon_key in self.transitions:
+            if None in by_input:
                 raise ValueError(
                     f"Ya existe una transicion lambda desde ({state}, {SIMBOLO_LAMBDA}, {stack_top}). "
                     f"No se puede agregar transición con símbolo de entrada."
                 )
-        else:
+        elif by_input:
             # y si agregamos transicion lambda, no debe haber transiciones con símbolos
-            for symbol in self.input_alphabet:
-                symbol_key = (state, symbol, stack_top)
-                if symbol_key in self.transitions:
-                    raise ValueError(
-                        f"Ya existe transición con símbolo desde ({state}, {symbol}, {stack_top}). "
-                        f"No se puede agregar transicion lambda."
-                    )
+            symbol = next(iter(by_input))
+            raise ValueError(
+                f"Ya existe transición con símbolo desde ({state}, {symbol}, {stack_top}). "
+                f"No se puede agregar transicion lambda."
+            )
         
-        self.transitions[key] = (new_state, stack_push)
+        self.transitions[key] = by_input[input_symbol] = (new_state, stack_push)
+        if self._by_target is not None:
+            self._by_target[new_state].add(key)
+        if input_symbol is SIMBOLO_LAMBDA and len(stack_push) == 1:
+            self._add_lambda_link(state, stack_top, new_state, stack_push)
+        # lo mismo que _invalidate, sin la llamada (add_transition se llama mucho)
+        self._frozen = False
+        self._tx_version += 1
         
         # vamos extendiendo los alfabetos con las transiciones que vemos
         if input_symbol is not None:
             self.input_alphabet.add(input_symbol)
         self.stack_alphabet.add(stack_top)
         if stack_push:
-            for symbol in stack_push:
-                self.stack_alphabet.add(symbol)
+            self.stack_alphabet.update(stack_push)
+
+    def _add_transitions_unchecked(self, new_by_source: dict):
+        """
+        Agrega de una vez las transiciones dadas, agrupadas igual que _by_source
+        ({estado: {tope: {input: (nuevo_estado, cadena_pila)}}}), sin chequear que los
+        estados existan, el determinismo, ni extender los alfabetos. Los diccionarios
+        {input: ...} pasan a ser parte del autómata, no se copian.
+        
+        Es para construir autómatas nuevos que ya se sabe que son APD válidos (ver
+        APDC.crear_automata_complemento): tampoco descarta estructuras precalculadas ni
+        cadenas lambda cacheadas. Quien la usa tiene que cargar los alfabetos y llamar a
+        _invalidate al terminar.
+        """
+        all_transitions = self.transitions
+        by_source = self._by_source
+        by_target = self._by_target
+        eps_pred = self._eps_pred
+        for state, by_stack in new_by_source.items():
+            if state not in by_source:
+                by_source[state] = defaultdict(dict, by_stack)
+            else:
+                row = by_source[state]
+                for stack_top, by_input in by_stack.items():
+                    if stack_top in row:
+                        row[stack_top].update(by_input)
+                    else:
+                        row[stack_top] = by_input
+            for stack_top, by_input in by_stack.items():
+                for input_symbol, target in by_input.items():
+                    all_transitions[(state, input_symbol, stack_top)] = target
+                    if by_target is not None:
+                        by_target[target[0]].add((state, input_symbol, stack_top))
+                target = by_input.get(SIMBOLO_LAMBDA)
+                if target is not None and len(target[1]) == 1:
+                    eps_pred[target].add((state, stack_top))
+
+    def _add_lambda_link(self, state: Hashable, stack_top: str, new_state: Hashable, stack_push: str):
+        """
+        Registra una transición lambda que solo reemplaza el tope de la pila, y descarta
+        las cadenas lambda cacheadas que ahora siguen de largo por (state, stack_top).
+        """
+        self._eps_pred[(new_state, stack_push)].add((state, stack_top))
+        self._forget_lambda_chain((state, stack_top))
+
+    def _forget_lambda_chain(self, key: tuple):
+        """Descarta de _eps_cache a key y a todos los pares cuya cadena pasa por key."""
+        if not self._eps_cache:
+            return
+        self._eps_cache.pop(key, None)
+        pending = [key]
+        while pending:
+            for previous in self._eps_pred.get(pending.pop(), ()):
+                # si no está cacheado, tampoco lo está nada de lo que pasa por él
+                # (y así cada par se visita una sola vez)
+                if previous in self._eps_cache:
+                    del self._eps_cache[previous]
+                    pending.append(previous)
 
     def get_transition(self, state: Hashable, input_symbol: Optional[str], 
                       stack_top: str) -> Optional[tuple]:
@@ -139,46 +227,121 @@ class APD(AP):
         Returns:
             True si la cadena es aceptada, False en caso contrario
         """
+        if not self._frozen:
+            # Congelar cuesta más o menos lo mismo que leer unos pocos símbolos por
+            # transición, así que para pocas cadenas cortas no conviene: hasta que lo
+            # leído desde la última modificación pase ese umbral se corre sobre los
+            # diccionarios. Una sola cadena larga congela de entrada.
+            if self._unfrozen_version != self._tx_version:
+                self._unfrozen_version = self._tx_version
+                self._unfrozen_work = 0
+            self._unfrozen_work += len(word) + 1
+            size = len(self.transitions) + len(self.states) + 1
+            if self._unfrozen_work < _FREEZE_WORK_PER_ELEMENT * size:
+                return self._run_unfrozen(word, acceptance_mode)
+            self.freeze()
+        # los resultados se cachean hasta la próxima modificación del autómata (ver freeze)
+        return self._accepts_cached(word, acceptance_mode)
+
+    def _run_unfrozen(self, word: str, acceptance_mode: str) -> bool:
+        """
+        Corre accepts directamente sobre _by_source, sin congelar. Hace lo mismo que
+        _accepts_core, incluida la detección de loops de transiciones lambda.
+        """
+        by_source = self._by_source
+        final_states = self.final_states
+        mode = _ACCEPTANCE_MODES.get(acceptance_mode)
         state = self.initial_state
-        #stack = [self.initial_stack_symbol]
-        remaining_input = word
         stack = [self.initial_stack_symbol]
+        n = len(word)
+        pos = 0
+        # pares (estado, tope) vistos desde la última lectura, con la altura de la pila
+        seen = set()
+        trail_keys = []
+        trail_heights = []
         
-        #max_steps = 10000 #esto para que termine si se cuelga en un loop
-        max_steps = len(word) * 100 + 1000  # para evitar loops infinitos
-        steps = 0
-        
-        while steps < max_steps:
-            steps += 1
-            
+        while True:
             # Verificar condiciones de aceptación
-            if not remaining_input:  # input consumido
-                if acceptance_mode == "final_state":
-                    if state in self.final_states:
+            if pos >= n:  # input consumido
+                if mode == 0:
+                    if state in final_states:
                         return True
-                elif acceptance_mode == "empty_stack":
+                elif mode == 1:
                     if not stack:
                         return True
             
-            result = self.step(state, remaining_input, stack)
-            if result is None:
-                # no hay transición posible, el automata se cuelga (no continuo)
+            if not stack:
                 break
             
-            state, remaining_input, stack = result
-        
-        #print("max steps alcanzados")
-        if steps == max_steps:
-            print("max steps alcanzados, el automata se cuelga en algun punto")
+            by_stack = by_source.get(state)
+            by_input = by_stack.get(stack[-1]) if by_stack else None
+            if not by_input:
+                break
+            transition = by_input.get(word[pos]) if pos < n else None
+            if transition is not None:
+                # transición que lee el símbolo
+                pos += 1
+                if trail_keys:
+                    seen.clear()
+                    trail_keys.clear()
+                    trail_heights.clear()
+            else:
+                # transicion lambda (sin consumir input), si hay
+                transition = by_input.get(SIMBOLO_LAMBDA)
+                if transition is None:
+                    break
+                sp = len(stack)
+                while trail_heights and trail_heights[-1] > sp:
+                    trail_heights.pop()
+                    seen.discard(trail_keys.pop())
+                key = (state, stack[-1])
+                if key in seen:
+                    print("loop de transiciones lambda, el automata se cuelga en algun punto")
+                    break
+                seen.add(key)
+                trail_keys.append(key)
+                trail_heights.append(sp)
             
-        if not remaining_input:
-            if acceptance_mode == "final_state":
-                return state in self.final_states
-            elif acceptance_mode == "empty_stack":
-                return not stack
+            # pop del tope y push de la cadena (el primer símbolo queda arriba)
+            state, stack_string = transition
+            stack.pop()
+            stack.extend(reversed(stack_string))
         
         return False
 
+    def _run(self, word: str, acceptance_mode: str) -> bool:
+        """Corre accepts sobre la representación congelada, sin pasar por el cache."""
+        if self._initial_state_id is None:
+            return False
+        
+        # si la pila no puede crecer, corremos el AFD equivalente (ver try_compile_to_dfa)
+        if acceptance_mode not in self._dfas:
+            self._dfas[acceptance_mode] = self.try_compile_to_dfa(acceptance_mode)
+        dfa = self._dfas[acceptance_mode]
+        if dfa is not None:
+            return dfa.accepts(word)
+        
+        # traducimos la cadena una sola vez al desplazamiento de cada símbolo en la tabla
+        # (los símbolos que no son del alfabeto van a una columna propia), y al final
+        # agregamos el de la columna lambda para cuando se termina el input
+        input_ids = self._input_ids
+        unknown_id = self._unknown_input_id
+        n_stack = self._n_stack
+        word_offsets = [input_ids.get(symbol, unknown_id) * n_stack for symbol in word]
+        word_offsets.append(0)
+        
+        # la pila se reserva una sola vez (crece sola si algun push no entra)
+        stack = array(self._stack_typecode, [0]) * (len(word) + 1)
+        stack[0] = self._initial_stack_id
+        
+        mode = _ACCEPTANCE_MODES.get(acceptance_mode)
+        # los estados muertos solo sirven para cortar antes en la aceptación por estado final
+        dead_mask = self._get_dead_mask() if mode == 0 else self._no_dead_mask
+        
+        return _accepts_core(self._ttable, self._targets, self._new_tops, self._push_below, self._row_size,
+                             n_stack, word_offsets, self._initial_state_id,
+                             self._is_final, dead_mask, stack, mode)
+
     def is_deterministic(self) -> bool:
         """
         Verifica que el autómata sea realmente determinístico.
@@ -186,24 +349,369 @@ class APD(AP):
         Returns:
             True si cumple con las propiedades de determinismo
         """
-        # Verificar que no hay conflictos entre transiciones
-        for (state, input_sym, stack_sym) in self.transitions.keys():
-            # Si hay transicion lambda, no debe haber transición con simbolo
-            if input_sym is None:
-                for symbol in self.input_alphabet:
-                    if (state, symbol, stack_sym) in self.transitions:
-                        return False
+        # Verificar que no hay conflictos entre transiciones:
+        # si hay transicion lambda para (estado, tope), no debe haber transición con simbolo
+        for by_stack in self._by_source.values():
+            for by_input in by_stack.values():
+                if SIMBOLO_LAMBDA in by_input and len(by_input) > 1:
+                    return False
         
         return True
 
+    def _get_by_target(self) -> defaultdict:
+        """Devuelve el índice de transiciones por estado destino, armándolo si hace falta."""
+        if self._by_target is None:
+            self._by_target = defaultdict(set)
+            for key, (new_state, _) in self.transitions.items():
+                self._by_target[new_state].add(key)
+        return self._by_target
+
     def _rename_state_in_transitions(self, old_name: Hashable, new_name: Hashable):
-        """Renombra un estado dentro de las transiciones del autómata."""
-        new_transitions = {}
+        """
+        Renombra un estado dentro de las transiciones del autómata.
         
+        Usa los índices por origen y por destino para tocar solo las transiciones
+        que mencionan al estado, en lugar de reconstruir todas.
+        """
+        by_target = self._get_by_target()
+        
+        # Transiciones que salen de old_name: cambian de clave
+        by_stack = self._by_source.pop(old_name, {})
+        for stack_sym, by_input in by_stack.items():
+            for input_sym, (target_state, stack_string) in by_input.items():
+                old_key = (old_name, input_sym, stack_sym)
+                new_key = (new_name, input_sym, stack_sym)
+                del self.transitions[old_key]
+                self.transitions[new_key] = (target_state, stack_string)
+                by_target[target_state].discard(old_key)
+                by_target[target_state].add(new_key)
+                if input_sym is SIMBOLO_LAMBDA and len(stack_string) == 1:
+                    self._eps_pred[(target_state, stack_string)].discard((old_name, stack_sym))
+                    self._eps_pred[(target_state, stack_string)].add((new_name, stack_sym))
+        if by_stack:
+            self._by_source[new_name] = by_stack
+        
+        # Transiciones que llegan a old_name: cambia el destino
+        keys = by_target.pop(old_name, set())
+        for key in keys:
+            state, input_sym, stack_sym = key
+            stack_string = self.transitions[key][1]
+            self.transitions[key] = (new_name, stack_string)
+            self._by_source[state][stack_sym][input_sym] = (new_name, stack_string)
+            if input_sym is SIMBOLO_LAMBDA and len(stack_string) == 1:
+                self._eps_pred[(old_name, stack_string)].discard((state, stack_sym))
+                self._eps_pred[(new_name, stack_string)].add((state, stack_sym))
+        if keys:
+            by_target[new_name] = keys
+        
+        # las cadenas lambda cacheadas usan los nombres viejos
+        self._eps_cache.clear()
+        # el estado conserva su id
+        if old_name in self._state_ids:
+            self._state_ids[new_name] = self._state_ids.pop(old_name)
+
+    def freeze(self):
+        """
+        Precalcula una representación con enteros del autómata para acelerar accepts.
+        accepts la llama sola cuando ya leyó suficiente, y cualquier modificación del
+        autómata la descarta. Devuelve el autómata.
+        
+        Estados y símbolos se numeran desde 0 (el id 0 de entrada es lambda). Lo que
+        queda armado:
+        - _ttable: array plano indexado por (estado, entrada, tope). Cada celda tiene
+          el índice k de la transición, -2 - k si es la transición lambda k (copiada en
+          las columnas de todos los símbolos), o -1 si no hay transición.
+        - _targets, _new_tops, _push_below: columnas paralelas indexadas por k, con el
+          estado destino y la cadena a apilar (invertida) separada en el nuevo tope (-1
+          si solo desapila) y lo que queda debajo. La separación de cada cadena se
+          calcula una sola vez y se reusa en los siguientes congelamientos.
+        Cada cadena de transiciones lambda que solo cambian el tope (ver
+        _lambda_chain_end) se resuelve con una transición agregada al final que va
+        directo a donde termina. Los estados muertos se calculan recién cuando hacen
+        falta (ver _get_dead_mask).
+        """
+        state_ids = self._state_ids
+        for state in self.states:
+            if state not in state_ids:
+                state_ids[state] = len(state_ids)
+        input_ids = self._input_ids
+        for symbol in self.input_alphabet:
+            if symbol not in input_ids:
+                input_ids[symbol] = len(input_ids)
+        # columna extra, siempre vacía, para los símbolos que no son del alfabeto
+        self._unknown_input_id = len(input_ids)
+        stack_ids = self._stack_ids
+        for symbol in (*self.stack_alphabet, self.initial_stack_symbol):
+            if symbol not in stack_ids:
+                stack_ids[symbol] = len(stack_ids)
+        # is_final[id] es 1 si el estado es final
+        is_final = bytearray(len(state_ids))
+        for state in self.final_states:
+            is_final[state_ids[state]] = 1
+        self._is_final = bytes(is_final)
+        self._initial_state_id = state_ids.get(self.initial_state)
+        self._initial_stack_id = stack_ids[self.initial_stack_symbol]
+        
+        n_stack = self._n_stack = len(stack_ids)
+        typecode = self._stack_typecode = "B" if n_stack <= 256 else "I"
+        row_size = self._row_size = (len(input_ids) + 1) * n_stack
+        ttable = self._ttable = array("i", [-1]) * (len(state_ids) * row_size)
+        targets = self._targets = array("i")
+        new_tops = self._new_tops = array("i")
+        push_below = self._push_below = []
+        push_splits = self._push_splits
+        # transiciones lambda que empiezan una cadena que solo cambia el tope
+        chain_starts = []
         for (state, input_sym, stack_sym), (target_state, stack_string) in self.transitions.items():
-            new_state = new_name if state == old_name else state
-            new_target = new_name if target_state == old_name else target_state
-            new_transitions[(new_state, input_sym, stack_sym)] = (new_target, stack_string)
+            transition = len(targets)
+            index = state_ids[state] * row_size + stack_ids[stack_sym]
+            if input_sym is SIMBOLO_LAMBDA:
+                # negativa, y copiada en las columnas de todos los símbolos sin transición
+                # propia (incluida la de símbolos desconocidos)
+                for column in range(index, index + row_size, n_stack):
+                    if ttable[column] == -1:
+                        ttable[column] = -2 - transition
+                if len(stack_string) == 1:
+                    chain_starts.append((index, target_state, stack_string))
+            else:
+                ttable[index + input_ids[input_sym] * n_stack] = transition
+            targets.append(state_ids[target_state])
+            split = push_splits.get((typecode, stack_string))
+            if split is None:
+                push = array(typecode, [stack_ids[symbol] for symbol in stack_string[::-1]])
+                split = push_splits[(typecode, stack_string)] = (push[-1] if push else -1, push[:-1])
+            new_tops.append(split[0])
+            push_below.append(split[1])
+        
+        # Atajos para las cadenas lambda: reemplazan a la transición que empieza la cadena
+        no_below = array(typecode)
+        for index, target_state, stack_string in chain_starts:
+            start = (target_state, stack_string)
+            end = self._lambda_chain_end(*start)
+            if end is None or end == start:
+                continue
+            end_state, end_top = end
+            shortcut = len(targets)
+            targets.append(state_ids[end_state])
+            new_tops.append(stack_ids[end_top])
+            push_below.append(no_below)
+            lambda_cell = ttable[index]
+            for column in range(index, index + row_size, n_stack):
+                if ttable[column] == lambda_cell:
+                    ttable[column] = -2 - shortcut
+        
+        self._dead_mask = None
+        self._no_dead_mask = bytes(len(state_ids))
+        
+        # AFDs equivalentes por modo de aceptación, se construyen la primera vez que hacen falta
+        self._dfas = {}
+        
+        # cache de resultados de accepts, propio de esta representación congelada
+        self._accepts_cached = lru_cache(maxsize=_ACCEPTS_CACHE_SIZE)(self._run)
         
-        self.transitions = new_transitions
+        self._frozen = True
+        return self
 
+    def _get_dead_mask(self) -> bytes:
+        """
+        Devuelve (y calcula la primera vez después de congelar) la máscara de estados
+        muertos: los que no llegan a ningún estado final, mirando solo el grafo de
+        transiciones (sin importar la pila). Se calculan hacia atrás desde los finales.
+        """
+        if self._dead_mask is None:
+            state_ids = self._state_ids
+            predecessors = defaultdict(set)
+            for (state, _, _), (target_state, _) in self.transitions.items():
+                predecessors[state_ids[target_state]].add(state_ids[state])
+            alive = {state_id for state_id, final in enumerate(self._is_final) if final}
+            pending = list(alive)
+            while pending:
+                for state_id in predecessors[pending.pop()]:
+                    if state_id not in alive:
+                        alive.add(state_id)
+                        pending.append(state_id)
+            self._dead_mask = bytes(0 if i in alive else 1 for i in range(len(state_ids)))
+        return self._dead_mask
+
+    def try_compile_to_dfa(self, acceptance_mode: str = "final_state") -> Optional[AFD]:
+        """
+        Construye un AFD equivalente al autómata, si la pila nunca puede crecer.
+        
+        Si ninguna transición apila más de un símbolo, la pila tiene siempre un solo
+        símbolo (o está vacía), así que las configuraciones posibles son pares (estado,
+        tope) y son finitas: el AFD tiene un estado por cada configuración alcanzable
+        (numerados desde 0, el inicial), y cada transición que lee un símbolo desde una
+        configuración (siguiendo antes sus transiciones lambda) va a la configuración
+        resultante. Una configuración es final si, con el input ya consumido, el APD
+        acepta desde ella en el modo de aceptación dado.
+        
+        Returns:
+            El AFD, o None si alguna transición apila más de un símbolo, si hay un loop
+            de transiciones lambda (para que accepts lo siga avisando), o si hay una
+            transición lambda y una con símbolo para el mismo (estado, tope)
+        """
+        if acceptance_mode not in _ACCEPTANCE_MODES or self.initial_state is None:
+            return None
+        if any(len(stack_string) > 1 for _, stack_string in self.transitions.values()):
+            return None
+        
+        dfa = AFD()
+        # configuración -> id; el tope es None si la pila quedó vacía
+        ids = {}
+        configs = [(self.initial_state, self.initial_stack_symbol)]
+        ids[configs[0]] = 0
+        dfa.add_state(0)
+        dfa.mark_initial_state(0)
+        # configs crece mientras lo recorremos, con cada configuración nueva
+        for config_id, (state, stack_top) in enumerate(configs):
+            # seguimos las transiciones lambda, viendo si se acepta al terminar el input
+            accepted = False
+            visited = set()
+            by_input = {}
+            while True:
+                if acceptance_mode == "final_state" and state in self.final_states:
+                    accepted = True
+                if stack_top is None:
+                    accepted = accepted or acceptance_mode == "empty_stack"
+                    break
+                by_input = self._by_source.get(state, {}).get(stack_top, {})
+                if SIMBOLO_LAMBDA not in by_input:
+                    break
+                if len(by_input) > 1 or (state, stack_top) in visited:
+                    return None
+                visited.add((state, stack_top))
+                state, stack_string = by_input[SIMBOLO_LAMBDA]
+                stack_top = stack_string or None
+            if accepted:
+                dfa.final_states.add(config_id)
+            
+            if stack_top is None:
+                continue
+            for input_symbol, (new_state, stack_string) in by_input.items():
+                target = (new_state, stack_string or None)
+                if target not in ids:
+                    ids[target] = len(configs)
+                    configs.append(target)
+                    dfa.add_state(ids[target])
+                dfa.add_transition(config_id, ids[target], input_symbol)
+        return dfa
+
+    def _lambda_chain_end(self, state: Hashable, stack_top: str) -> Optional[tuple]:
+        """
+        Sigue desde (estado, tope) la cadena de transiciones lambda que solo reemplazan
+        el tope de la pila, y devuelve el (estado, tope) en el que termina: el primero
+        que no tiene una transición lambda así, o que es final (accepts tiene que verlo
+        si el input ya se consumió). Devuelve None si la cadena entra en un ciclo.
+        
+        El resultado de cada par recorrido queda en _eps_cache, que se mantiene entre
+        llamadas a freeze: agregar transiciones lambda descarta solo las cadenas afectadas.
+        """
+        path = []
+        on_path = set()
+        key = (state, stack_top)
+        while True:
+            if key in self._eps_cache:
+                end = self._eps_cache[key]
+                break
+            if key in on_path:
+                end = None
+                break
+            state, stack_top = key
+            transition = self._by_source.get(state, {}).get(stack_top, {}).get(SIMBOLO_LAMBDA)
+            if state in self.final_states or transition is None or len(transition[1]) != 1:
+                end = key
+                break
+            path.append(key)
+            on_path.add(key)
+            # (nuevo_estado, cadena_pila) es justamente el próximo (estado, tope)
+            key = transition
+        for key in path:
+            self._eps_cache[key] = end
+        return end
+
+
+def _accepts_core(ttable: array, targets: array, new_tops: array, push_below: list,
+                  row_size: int, n_stack: int,
+                  word_offsets: list, state: int, is_final: bytes, dead_mask: bytes,
+                  stack: array, mode: Optional[int]) -> bool:
+    """
+    Ciclo principal de APD.accepts sobre la representación congelada (ver freeze).
+    Recibe todo como argumentos para trabajar solo con variables locales y enteros.
+    
+    word_offsets es la cadena traducida a desplazamientos dentro de una fila de la
+    tabla, terminada con el de la columna lambda. La pila viene reservada con el
+    símbolo inicial en stack[0]; el tope va en una variable aparte y, con altura sp,
+    stack[0:sp - 1] es lo que está debajo.
+    
+    Corta si entra en un estado de dead_mask, o si entre dos lecturas vuelve al mismo
+    (estado, tope) sin que la pila haya bajado: al ser determinístico es un loop lambda.
+    """
+    n = len(word_offsets) - 1
+    pos = 0
+    sp = 1
+    top = stack[0]
+    # pares (estado, tope) vistos desde la última lectura, y en dos listas paralelas
+    # cada par con la altura de la pila en ese momento (ordenadas de menor a mayor)
+    seen = set()
+    trail_keys = []
+    trail_heights = []
+    
+    while True:
+        if dead_mask[state]:
+            return False
+        
+        # Verificar condiciones de aceptación
+        if pos >= n:  # input consumido
+            if mode == 0:
+                if is_final[state]:
+                    return True
+            elif mode == 1:
+                if sp == 0:
+                    return True
+        
+        if sp == 0:
+            break
+        
+        transition = ttable[state * row_size + word_offsets[pos] + top]
+        if transition >= 0:
+            # transición que lee el símbolo
+            pos += 1
+            if trail_keys:
+                seen.clear()
+                trail_keys.clear()
+                trail_heights.clear()
+        elif transition == -1:
+            # no hay transición posible, el automata se cuelga (no continuo)
+            break
+        else:
+            # transicion lambda (sin consumir input)
+            transition = -2 - transition
+            # los pares vistos mas arriba de la altura actual ya no sirven
+            while trail_heights and trail_heights[-1] > sp:
+                trail_heights.pop()
+                seen.discard(trail_keys.pop())
+            key = state * n_stack + top
+            if key in seen:
+                print("loop de transiciones lambda, el automata se cuelga en algun punto")
+                break
+            seen.add(key)
+            trail_keys.append(key)
+            trail_heights.append(sp)
+        
+        # pop del tope y push de la cadena: si no apila nada el tope pasa a ser el
+        # de abajo, y si no lo de abajo de la cadena va encima del resto de la pila
+        new_top = new_tops[transition]
+        if new_top < 0:
+            sp -= 1
+            if sp:
+                top = stack[sp - 1]
+        else:
+            below = push_below[transition]
+            if below:
+                stack[sp - 1:sp - 1 + len(below)] = below
+                sp += len(below)
+            top = new_top
+        state = targets[transition]
+    
+    # la configuración en la que se cortó ya se chequeó al principio de la iteración
+    return False
@@ -31,11 +31,11 @@ class APDC(APD):
         C = APDC()
         
         # Empezamos con las 3 definiciones que da el teorema, definiendo Q', q0', y F'.
-        # Para cada estado de P creamos 3 estados, uno con cada indice (0,1,2)
-        for q in self.states:
-            C.add_state((q, 0), final=False)
-            C.add_state((q, 1), final=False)
-            C.add_state((q, 2), final=True)
+        # Para cada estado de P creamos 3 estados, uno con cada indice (0,1,2).
+        # Como C es nuevo se cargan directo en los conjuntos, sin pasar por add_state
+        # (freeze les asigna los ids después).
+        C.states = {(q, i) for q in self.states for i in (0, 1, 2)}
+        C.final_states = {(q, 2) for q in self.states}
         
         # si q0 no es final, entonces el estado inicial de C es [q0, 0], 
         # pero si q0 es final, entonces el estado inicial de C es [q0, 1]
@@ -44,7 +44,9 @@ class APDC(APD):
         else:
             C.mark_initial_state((self.initial_state, 0))
         
-        # los alfabetos y el simbolo inicial de pila son los mismos que los de P, los copiamos:
+        # los alfabetos y el simbolo inicial de pila son los mismos que los de P, los copiamos.
+        # Las transiciones se agregan sin los chequeos de add_transition: por el teorema C es
+        # determinístico, y sus alfabetos son justamente estos.
         C.input_alphabet = self.input_alphabet.copy()
         C.stack_alphabet = self.stack_alphabet.copy()
         C.set_initial_stack_symbol(self.initial_stack_symbol)
@@ -56,35 +58,53 @@ class APDC(APD):
         # - [q, 1] lee a y pasa a [p, i]
         # - [q, 2] lee a y pasa a [p, i] 
         # Se usa i = 0 si p no es final, i = 1 si p es final
-        
-        for (q, input_symbol, stack_symbol), (p, stack_push) in self.transitions.items():
-            if input_symbol is SIMBOLO_LAMBDA:
-                continue
-            i = 1 if p in self.final_states else 0
-            C.add_transition((q, 1), (p, i), input_symbol, stack_symbol, stack_push)
-            C.add_transition((q, 2), (p, i), input_symbol, stack_symbol, stack_push)
-        
+        #
         # Regla (ii): Transiciones lambda
         # Si el estado q no lee simbolo y solo cambia estado y pila, entonces:
         # - [q, 1] no lee simbolo y pasa a [p, 1], con el cambio de estado y pila
         # - [q, 0] no lee simbolo y pasa a [p, i], con el cambio de estado y pila
         # Se usa i = 0 si p no es final, i = 1 si p es final
-        for (q, input_symbol, stack_symbol), (p, stack_push) in self.transitions.items():
-            if input_symbol is not SIMBOLO_LAMBDA:
-                continue
-            i = 1 if p in self.final_states else 0
-            C.add_transition((q, 1), (p, 1), SIMBOLO_LAMBDA, stack_symbol, stack_push)
-            C.add_transition((q, 0), (p, i), SIMBOLO_LAMBDA, stack_symbol, stack_push)
+        #
+        # Las dos reglas se aplican en una sola pasada sobre las transiciones de P.
+        # De paso juntamos los pares (q, simbolo_pila) con transicion lambda para la regla (iii).
+        # Las transiciones de C se van juntando agrupadas como en _by_source
+        # ({estado: {tope: {input: (nuevo_estado, cadena_pila)}}}) y se agregan todas juntas.
+        new_by_source = {}
+        lambda_set = set()
+        for q, by_stack in self._by_source.items():
+            by_stack_0, by_stack_1, by_stack_2 = {}, {}, {}
+            for stack_symbol, by_input in by_stack.items():
+                lambda_transition = by_input.get(SIMBOLO_LAMBDA)
+                if lambda_transition is not None:
+                    p, stack_push = lambda_transition
+                    i = 1 if p in self.final_states else 0
+                    by_stack_1[stack_symbol] = {SIMBOLO_LAMBDA: ((p, 1), stack_push)}
+                    by_stack_0[stack_symbol] = {SIMBOLO_LAMBDA: ((p, i), stack_push)}
+                    lambda_set.add((q, stack_symbol))
+                elif by_input:
+                    by_input_1 = {}
+                    for input_symbol, (p, stack_push) in by_input.items():
+                        i = 1 if p in self.final_states else 0
+                        by_input_1[input_symbol] = ((p, i), stack_push)
+                    by_stack_1[stack_symbol] = by_input_1
+                    by_stack_2[stack_symbol] = by_input_1.copy()
+            new_by_source[(q, 0)] = by_stack_0
+            new_by_source[(q, 1)] = by_stack_1
+            new_by_source[(q, 2)] = by_stack_2
         
         # Regla (iii): saltamos a indice 2 cuando ya no quedan transiciones lambda disponibles
         # Si no hay transiciones lambda desde q, entonces:
         # - [q, 0] no lee simbolo y pasa a [q, 2], con el cambio de estado
         for q in self.states:
+            by_stack_0 = new_by_source.setdefault((q, 0), {})
             for stack_symbol in self.stack_alphabet:
-                has_lambda_transition = (q, SIMBOLO_LAMBDA, stack_symbol) in self.transitions
+                has_lambda_transition = (q, stack_symbol) in lambda_set
                 if not has_lambda_transition:
-                    C.add_transition((q, 0), (q, 2), SIMBOLO_LAMBDA, stack_symbol, stack_symbol)
+                    by_stack_0[stack_symbol] = {SIMBOLO_LAMBDA: ((q, 2), stack_symbol)}
         
+        # Agregamos todo de una vez, e invalidamos una sola vez al final
+        C._add_transitions_unchecked(new_by_source)
+        C._invalidate()
         return C
 
     def __str__(self):
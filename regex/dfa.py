@@ -0,0 +1,266 @@
+"""
+Compilación de expresiones regulares a un AFD, para matchear en tiempo lineal.
+
+El AFD se construye con derivadas de Brzozowski: cada estado es una expresión
+regular (en una representación interna con tuplas, ya simplificada) y la
+transición por un símbolo `a` lleva a la derivada de la expresión respecto de `a`.
+Simplificando uniones (sin repetidos ni orden) y concatenaciones con λ/∅ la
+cantidad de derivadas distintas es finita, así que la construcción termina.
+"""
+from typing import Hashable, Optional
+
+from automata import AFD
+from regex import RegEx, Empty, Lambda, Char, Concat, Union, Star, Plus
+
+__all__ = ["build", "literals", "compile_hybrid"]
+
+# Representación interna de las expresiones
+EMPTY = ("empty",)
+LAMBDA = ("lambda",)
+
+# Máxima cantidad de palabras para matchear una expresión como conjunto de literales
+MAX_LITERALS = 4096
+
+
+def _char(char: str) -> tuple:
+    return ("char", char)
+
+
+def _concat(exp1: tuple, exp2: tuple) -> tuple:
+    if exp1 == EMPTY or exp2 == EMPTY:
+        return EMPTY
+    if exp1 == LAMBDA:
+        return exp2
+    if exp2 == LAMBDA:
+        return exp1
+    if exp1[0] == "concat":
+        # Asociamos siempre a derecha, así (ab)c y a(bc) son la misma expresión
+        return _concat(exp1[1], _concat(exp1[2], exp2))
+    return ("concat", exp1, exp2)
+
+
+def _union(*exps: tuple) -> tuple:
+    alternatives = set()
+    for exp in exps:
+        if exp[0] == "union":
+            alternatives |= exp[1]
+        elif exp != EMPTY:
+            alternatives.add(exp)
+    if len(alternatives) == 0:
+        return EMPTY
+    if len(alternatives) == 1:
+        return next(iter(alternatives))
+    return ("union", frozenset(alternatives))
+
+
+def _star(exp: tuple) -> tuple:
+    if exp == EMPTY or exp == LAMBDA:
+        return LAMBDA
+    if exp[0] == "star":
+        return exp
+    return ("star", exp)
+
+
+def _to_term(regex: RegEx) -> Optional[tuple]:
+    """
+    Traduce la expresión regular a la representación interna.
+    Devuelve None si aparece algún nodo que no sabemos compilar.
+    """
+    if isinstance(regex, Empty):
+        return EMPTY
+    if isinstance(regex, Lambda):
+        return LAMBDA
+    if isinstance(regex, Char):
+        return _char(regex.char)
+    if isinstance(regex, (Concat, Union)):
+        exp1 = _to_term(regex.exp1)
+        exp2 = _to_term(regex.exp2)
+        if exp1 is None or exp2 is None:
+            return None
+        return _concat(exp1, exp2) if isinstance(regex, Concat) else _union(exp1, exp2)
+    if isinstance(regex, (Star, Plus)):
+        exp = _to_term(regex.exp)
+        if exp is None:
+            return None
+        # e+ = e e*
+        return _star(exp) if isinstance(regex, Star) else _concat(exp, _star(exp))
+    return None
+
+
+def _chars(exp: tuple) -> set[str]:
+    """Símbolos que aparecen en la expresión."""
+    kind = exp[0]
+    if kind == "char":
+        return {exp[1]}
+    if kind == "concat":
+        return _chars(exp[1]) | _chars(exp[2])
+    if kind == "union":
+        return set().union(*(_chars(alternative) for alternative in exp[1]))
+    if kind == "star":
+        return _chars(exp[1])
+    return set()
+
+
+def _nullable(exp: tuple) -> bool:
+    """Indica si la expresión acepta la cadena vacía."""
+    kind = exp[0]
+    if kind == "lambda" or kind == "star":
+        return True
+    if kind == "concat":
+        return _nullable(exp[1]) and _nullable(exp[2])
+    if kind == "union":
+        return any(_nullable(alternative) for alternative in exp[1])
+    return False
+
+
+def _derivative(exp: tuple, char: str) -> tuple:
+    """Derivada de Brzozowski de la expresión respecto del símbolo."""
+    kind = exp[0]
+    if kind == "char":
+        return LAMBDA if exp[1] == char else EMPTY
+    if kind == "concat":
+        derivative = _concat(_derivative(exp[1], char), exp[2])
+        if _nullable(exp[1]):
+            return _union(derivative, _derivative(exp[2], char))
+        return derivative
+    if kind == "union":
+        return _union(*(_derivative(alternative, char) for alternative in exp[1]))
+    if kind == "star":
+        return _concat(_derivative(exp[1], char), exp)
+    return EMPTY
+
+
+def build(regex: RegEx) -> AFD:
+    """
+    Construye el AFD de la expresión regular calculando todas sus derivadas.
+    Los estados son enteros (0 es el inicial), y las transiciones que van a estados
+    desde los que no se puede aceptar directamente no están.
+    """
+    start = _to_term(regex)
+    if start is None:
+        raise ValueError(f"No se puede compilar la expresión regular {regex} a un AFD.")
+    alphabet = sorted(_chars(start))
+
+    ids = {start: 0}
+    terms = [start]
+    transitions = []
+    # terms crece mientras lo recorremos, con cada derivada nueva
+    for term in terms:
+        row = {}
+        for char in alphabet:
+            derivative = _derivative(term, char)
+            if derivative == EMPTY:
+                continue
+            if derivative not in ids:
+                ids[derivative] = len(terms)
+                terms.append(derivative)
+            row[char] = ids[derivative]
+        transitions.append(row)
+
+    # Dejamos afuera las transiciones a estados desde los que no se llega a un final,
+    # así accepts corta apenas la cadena ya no puede ser aceptada
+    predecessors = [set() for _ in terms]
+    for state, row in enumerate(transitions):
+        for target in row.values():
+            predecessors[target].add(state)
+    alive = {state for state, term in enumerate(terms) if _nullable(term)}
+    pending = list(alive)
+    while pending:
+        for state in predecessors[pending.pop()]:
+            if state not in alive:
+                alive.add(state)
+                pending.append(state)
+
+    afd = AFD()
+    for state, term in enumerate(terms):
+        afd.add_state(state, final=_nullable(term))
+    afd.mark_initial_state(0)
+    for state, row in enumerate(transitions):
+        for char, target in row.items():
+            if target in alive:
+                afd.add_transition(state, target, char)
+    return afd
+
+
+def literals(regex: RegEx) -> Optional[frozenset]:
+    """
+    Si la expresión regular denota un conjunto finito de palabras (no tiene clausuras),
+    devuelve ese conjunto. Devuelve None si no, o si tiene más de MAX_LITERALS palabras.
+    """
+    if isinstance(regex, Empty):
+        return frozenset()
+    if isinstance(regex, Lambda):
+        return frozenset({""})
+    if isinstance(regex, Char):
+        return frozenset({regex.char})
+    if isinstance(regex, (Concat, Union)):
+        words1 = literals(regex.exp1)
+        words2 = literals(regex.exp2) if words1 is not None else None
+        if words2 is None:
+            return None
+        if isinstance(regex, Union):
+            words = words1 | words2
+        elif len(words1) * len(words2) <= MAX_LITERALS:
+            words = frozenset(word1 + word2 for word1 in words1 for word2 in words2)
+        else:
+            return None
+        return words if len(words) <= MAX_LITERALS else None
+    return None
+
+
+class LiteralMatcher:
+    """Matcher para expresiones que son una unión de literales: basta con buscar la palabra."""
+
+    def __init__(self, words: frozenset):
+        self.words = words
+
+    def match(self, word: str) -> bool:
+        return word in self.words
+
+
+class AFDMatcher:
+    """Matcher que corre el AFD compilado de la expresión (ver build)."""
+
+    def __init__(self, afd: AFD):
+        self.afd = afd
+
+    def match(self, word: str) -> bool:
+        return self.afd.accepts(word)
+
+
+class NaiveMatcher:
+    """Matcher de respaldo para expresiones que no se pueden compilar a un AFD."""
+
+    def __init__(self, regex: RegEx):
+        self.regex = regex
+
+    def match(self, word: str) -> bool:
+        return self.regex.naive_match(word)
+
+
+# Matchers ya compilados, por clave (ver compile_hybrid)
+_compiled = {}
+
+
+def compile_hybrid(regex: RegEx, key: Hashable = None):
+    """
+    Elige el motor para matchear la expresión regular: si es una unión de literales
+    se busca la palabra en ese conjunto, si todos sus nodos se pueden compilar se
+    arma el AFD, y si no se usa naive_match.
+
+    El resultado se guarda con la clave dada (por defecto la misma expresión),
+    así compilar otra vez la misma expresión no cuesta nada.
+    """
+    if key is None:
+        key = regex
+    matcher = _compiled.get(key)
+    if matcher is None:
+        words = literals(regex)
+        if words is not None:
+            matcher = LiteralMatcher(words)
+        elif _to_term(regex) is not None:
+            matcher = AFDMatcher(build(regex))
+        else:
+            matcher = NaiveMatcher(regex)
+        _compiled[key] = matcher
+    return matcher
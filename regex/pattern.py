@@ -0,0 +1,66 @@
+"""
+Traducción de expresiones regulares a patrones de texto, para matchear con PCRE2
+(con JIT) si está instalado.
+"""
+import re
+
+from regex import RegEx, Empty, Lambda, Char, Concat, Union, Star, Plus
+from regex.dfa import compile_hybrid
+
+try:
+    import pcre2
+except ImportError:
+    pcre2 = None
+
+__all__ = ["to_pattern", "PatternMatcher", "compile_pattern"]
+
+
+def to_pattern(regex: RegEx) -> str:
+    """
+    Escribe la expresión regular como un patrón (con la sintaxis común a PCRE y re).
+    Las subexpresiones que no son atómicas se agrupan con (?:...).
+    """
+    if isinstance(regex, Empty):
+        # un lookahead negativo vacío nunca matchea
+        return "(?!)"
+    if isinstance(regex, Lambda):
+        return "(?:)"
+    if isinstance(regex, Char):
+        return re.escape(regex.char)
+    if isinstance(regex, Concat):
+        return _group(regex.exp1) + _group(regex.exp2)
+    if isinstance(regex, Union):
+        return f"{_group(regex.exp1)}|{_group(regex.exp2)}"
+    if isinstance(regex, Star):
+        return f"{_group(regex.exp)}*"
+    if isinstance(regex, Plus):
+        return f"{_group(regex.exp)}+"
+    raise ValueError(f"No se puede traducir la expresión regular {regex} a un patrón.")
+
+
+def _group(regex: RegEx) -> str:
+    pattern = to_pattern(regex)
+    return pattern if regex._atomic() else f"(?:{pattern})"
+
+
+class PatternMatcher:
+    """Matcher que usa el patrón compilado por PCRE2 (con JIT)."""
+
+    def __init__(self, regex: RegEx):
+        # anclado en los dos extremos: tiene que matchear la cadena entera
+        self._match = pcre2.compile(rf"\A(?:{to_pattern(regex)})\z", jit=True).match
+
+    def match(self, word: str) -> bool:
+        """Indica si el patrón acepta la cadena entera."""
+        return self._match(word) is not None
+
+
+def compile_pattern(regex: RegEx):
+    """
+    Compila la expresión regular con PCRE2. Si pcre2 no está instalado se usa el AFD
+    de compile_hybrid: los motores con backtracking (como re) pueden tardar un tiempo
+    exponencial con clausuras anidadas.
+    """
+    if pcre2 is None:
+        return compile_hybrid(regex)
+    return PatternMatcher(regex)
@@ -127,6 +127,191 @@ def test_apdc():
     return True
 
 
+def test_normalize_states():
+    """Prueba de normalize_states cuando los nombres nuevos se pisan con los viejos"""
+    print("\nTest: Normalización de estados (q1 <-> q0)")
+    print("-" * 40)
+    
+    apd = APD()
+    
+    # El estado inicial se llama q1 y el otro q0: el renombre forma un ciclo
+    apd.add_state("q1")
+    apd.add_state("q0", final=True)
+    apd.mark_initial_state("q1")
+    apd.set_initial_stack_symbol("Z")
+    
+    apd.add_transition("q1", "q0", "a", "Z", "Z")
+    apd.add_transition("q0", "q1", "b", "Z", "Z")
+    
+    apd.normalize_states()
+    
+    all_passed = (apd.states == {"q0", "q1"}
+                  and apd.initial_state == "q0"
+                  and apd.final_states == {"q1"})
+    print(f"  Estados: {apd.states}, inicial: {apd.initial_state}, finales: {apd.final_states}")
+    assert apd.states == {"q0", "q1"}, apd.states
+    assert apd.initial_state == "q0", apd.initial_state
+    assert apd.final_states == {"q1"}, apd.final_states
+    
+    tests = [
+        ("", False),
+        ("a", True),
+        ("ab", False),
+        ("aba", True),
+        ("b", False),
+    ]
+    
+    for word, expected in tests:
+        result = apd.accepts(word)
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} '{word}' -> {result} (esperado: {expected})")
+        assert result == expected, f"'{word}' -> {result} (esperado: {expected})"
+    
+    return all_passed
+
+
+def test_loop_lambda():
+    """Prueba de un autómata que se cuelga apilando con transiciones lambda"""
+    print("\nTest: Loop de transiciones lambda que hace crecer la pila")
+    print("-" * 40)
+    
+    apd = APD()
+    
+    apd.add_state("q0")
+    apd.add_state("q1")
+    apd.add_state("qf", final=True)
+    apd.mark_initial_state("q0")
+    apd.set_initial_stack_symbol("Z")
+    
+    apd.add_transition("q0", "qf", "a", "Z", "Z")
+    # Leyendo 'b' pasa a q1, que apila A para siempre sin leer nada
+    apd.add_transition("q0", "q1", "b", "Z", "Z")
+    apd.add_transition("q1", "q1", None, "Z", "AZ")
+    apd.add_transition("q1", "q1", None, "A", "AA")
+    
+    tests = [
+        ("a", True),
+        ("b", False),
+        ("ba", False),
+        ("b" + "a" * 1000, False),
+    ]
+    
+    all_passed = True
+    for word, expected in tests:
+        result = apd.accepts(word)
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} '{word[:10]}' -> {result} (esperado: {expected})")
+        assert result == expected, f"'{word[:10]}' -> {result} (esperado: {expected})"
+    
+    return all_passed
+
+
+def test_compile_to_dfa():
+    """Prueba de try_compile_to_dfa con un APD que nunca hace crecer la pila (aba o bab)"""
+    print("\nTest: APD con pila acotada compilado a AFD")
+    print("-" * 40)
+    
+    apd = APD()
+    
+    apd.add_state("q0")
+    apd.add_state("q1")
+    apd.add_state("q2", final=True)
+    
+    apd.mark_initial_state("q0")
+    apd.set_initial_stack_symbol("Z")
+    
+    # Lee a+ cambiando el tope, y con una b pasa a q2 por una transicion lambda
+    apd.add_transition("q0", "q1", "a", "Z", "A")
+    apd.add_transition("q1", "q1", "a", "A", "A")
+    apd.add_transition("q1", "q0", "b", "A", "B")
+    apd.add_transition("q0", "q2", None, "B", "Z")
+    # y en q2 con una c desapila (la pila queda vacía)
+    apd.add_transition("q2", "q2", "c", "Z", "")
+    
+    dfa = apd.try_compile_to_dfa()
+    all_passed = dfa is not None
+    print(f"  AFD: {dfa}")
+    assert dfa is not None, "no se pudo compilar a AFD"
+    
+    tests = [
+        ("", False),
+        ("ab", True),
+        ("aab", True),
+        ("aba", False),
+        ("abab", False),
+        ("abc", True),
+        ("abcc", False),
+        ("b", False),
+    ]
+    
+    for word, expected in tests:
+        result = apd.accepts(word)
+        dfa_result = dfa is not None and dfa.accepts(word)
+        status = "✓" if result == expected == dfa_result else "✗"
+        if not result == expected == dfa_result:
+            all_passed = False
+        print(f"  {status} '{word}' -> {result} (esperado: {expected})")
+        assert result == expected, f"'{word}' -> {result} (esperado: {expected})"
+        assert dfa_result == expected, f"'{word}' con el AFD -> {dfa_result} (esperado: {expected})"
+    
+    # aceptación por pila vacía: solo después de la c
+    for word, expected in [("ab", False), ("abc", True)]:
+        result = apd.accepts(word, "empty_stack")
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} '{word}' por pila vacía -> {result} (esperado: {expected})")
+        assert result == expected, f"'{word}' por pila vacía -> {result} (esperado: {expected})"
+    
+    # si alguna transición apila más de un símbolo no se puede compilar
+    apd.add_transition("q2", "q2", "a", "Z", "AZ")
+    if apd.try_compile_to_dfa() is not None:
+        all_passed = False
+        print("  ✗ se compiló a AFD un APD cuya pila crece")
+    assert apd.try_compile_to_dfa() is None, "se compiló a AFD un APD cuya pila crece"
+    
+    return all_passed
+
+
+def test_step():
+    """Prueba de step, un paso de cómputo a la vez"""
+    print("\nTest: Pasos de cómputo con step")
+    print("-" * 40)
+    
+    apd = APD()
+    
+    apd.add_state("q0")
+    apd.add_state("q1", final=True)
+    apd.mark_initial_state("q0")
+    apd.set_initial_stack_symbol("Z")
+    
+    apd.add_transition("q0", "q0", "a", "Z", "AZ")
+    apd.add_transition("q0", "q1", None, "A", "")
+    
+    tests = [
+        # (estado, input restante, pila) -> configuración siguiente
+        (("q0", "ab", ["Z"]), ("q0", "b", ["Z", "A"])),
+        (("q0", "b", ["Z", "A"]), ("q1", "b", ["Z"])),
+        (("q1", "b", ["Z"]), None),
+        (("q0", "a", []), None),
+    ]
+    
+    all_passed = True
+    for (state, remaining_input, stack), expected in tests:
+        result = apd.step(state, remaining_input, stack)
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} ({state}, '{remaining_input}', {stack}) -> {result} (esperado: {expected})")
+        assert result == expected, f"({state}, '{remaining_input}', {stack}) -> {result} (esperado: {expected})"
+    
+    return all_passed
+
+
 def main():
     print("\n" + "=" * 50)
     print("PRUEBAS DE AUTÓMATAS DE PILA")
@@ -136,6 +321,10 @@ def main():
     results.append(("a^n b^n (n>=1)", test_anbn()))
     results.append(("aba o bab", test_parentesis()))
     results.append(("APDC", test_apdc()))
+    results.append(("normalize_states", test_normalize_states()))
+    results.append(("loop lambda", test_loop_lambda()))
+    results.append(("compilar a AFD", test_compile_to_dfa()))
+    results.append(("step", test_step()))
     
     print("\n" + "=" * 50)
     print("RESUMEN")
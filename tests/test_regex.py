@@ -4,6 +4,9 @@ import importlib
 import pytest
 import re
 
+from regex.dfa import compile_hybrid
+from regex.pattern import compile_pattern, to_pattern
+
 # Setup: Genera los casos de test a partir de los archivos en tests/regexes/*.py
 case_names = [
     basename(filename)[:-3]
@@ -38,6 +41,25 @@ class TestRegex:
                 should_match = case["should_match"](string)
             assert does_match == should_match, f"La regex '{case['regex']}' {'no acepta' if should_match else 'acepta'} la cadena '{string}'"
 
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_compiled_match(self, case, strings):
+        '''El AFD compilado acepta las mismas cadenas que naive_match'''
+        regex = case["regex"]
+        matcher = compile_hybrid(regex)
+        for string in strings:
+            assert matcher.match(string) == regex.naive_match(string), f"El AFD compilado de la regex '{regex}' no coincide con naive_match en la cadena '{string}'"
+
+    @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
+    def test_pattern_match(self, case, strings):
+        '''El patrón traducido acepta las mismas cadenas que naive_match'''
+        regex = case["regex"]
+        matcher = compile_pattern(regex)
+        pattern = re.compile(to_pattern(regex))
+        for string in strings:
+            should_match = regex.naive_match(string)
+            assert matcher.match(string) == should_match, f"El matcher de --pcre-jit de la regex '{regex}' no coincide con naive_match en la cadena '{string}'"
+            assert (pattern.fullmatch(string) is not None) == should_match, f"El patrón de la regex '{regex}' no coincide con naive_match en la cadena '{string}'"
+
     @pytest.mark.parametrize("case", cases, ids=lambda case: f"{case['name']}:{case['regex']}")
     def test_min_afd_size(self, case):
         '''El tamaño del AFD mínimo es el esperado'''
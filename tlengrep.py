@@ -2,14 +2,66 @@
 import optparse
 import sys
 import importlib
+import io
+import codecs
+import os
+import pickle
+
+from automata import af as af_module, afd as afd_module
+from regex import dfa as dfa_module
+from regex.dfa import compile_hybrid
+from regex.pattern import compile_pattern
 
 usage = "%prog [regex] [file]"
 
+# Cantidad máxima de bytes que se leen de la entrada por vez
+CHUNK_SIZE = 1 << 20
+
 opt_parser = optparse.OptionParser(usage=usage)
 opt_parser.add_option("-n", "--naive", dest="naive", action="store_true",
                       help="use the naive implementation to match against the regular expression")
+opt_parser.add_option("--pcre-jit", dest="pcre_jit", action="store_true",
+                      help="translate the regular expression to a pattern and match it with PCRE2 (JIT), "
+                           "or with the compiled DFA if pcre2 is not installed")
+opt_parser.add_option("--no-cache", dest="no_cache", action="store_true",
+                      help="don't read or write the compiled regular expression cache")
 opts, args = opt_parser.parse_args()
 
+
+def load_matcher(regex_module, regex_arg, use_cache=True):
+    """
+    Compila la regex del módulo, reusando la compilación de una corrida anterior.
+    El matcher compilado se guarda en __pycache__/<regex_arg>.dfa junto al módulo,
+    con el mtime del módulo, el de regex/dfa.py (que arma el matcher) y los de
+    automata/af.py y automata/afd.py (el AFD que se guarda) para saber si sigue vigente.
+    """
+    regex = regex_module.__regex__
+    if not use_cache:
+        return compile_hybrid(regex, regex_arg)
+
+    version = tuple(os.path.getmtime(module.__file__)
+                    for module in (regex_module, dfa_module, af_module, afd_module))
+    cache_path = os.path.join(os.path.dirname(regex_module.__file__), "__pycache__", f"{regex_arg}.dfa")
+    try:
+        with open(cache_path, "rb") as cache_file:
+            cached_version, matcher = pickle.load(cache_file)
+        if cached_version == version:
+            return matcher
+    except Exception:
+        # Cache inexistente, roto o de otra versión: se vuelve a compilar
+        pass
+
+    matcher = compile_hybrid(regex, regex_arg)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "wb") as cache_file:
+            pickle.dump((version, matcher), cache_file, pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        # Si no se puede escribir el cache simplemente no lo usamos
+        pass
+    return matcher
+
+
 if len(args) < 1:
     opt_parser.print_help()
     exit(1)
@@ -23,12 +75,37 @@ else:
     regex = regex_module.__regex__
      
 
-    with open(args[1]) if len(args) == 2 else sys.stdin as input_file:
-        for line in input_file:
-            if opts.naive:
-                matched = regex.naive_match(line.strip("\n"))
-            else:
-                matched = regex.match(line.strip("\n"))
+    # Resolvemos el método y la salida una sola vez, fuera del ciclo. Por defecto
+    # se compila la regex a un AFD (o se usa naive_match si no se puede compilar)
+    if opts.naive:
+        match = regex.naive_match
+    elif opts.pcre_jit:
+        match = compile_pattern(regex).match
+    else:
+        match = load_matcher(regex_module, regex_arg, not opts.no_cache).match
+    stdout_write = sys.stdout.write
 
+    # Leemos la entrada en bloques y la partimos en líneas nosotros; la última línea de
+    # cada bloque puede estar cortada, así que queda pendiente para el siguiente.
+    # read1 devuelve lo que ya haya llegado (hasta CHUNK_SIZE bytes) sin esperar a
+    # llenar el bloque, así en un pipe cada línea sale apenas llega. Los bytes se
+    # decodifican como lo haría el archivo de texto: mismo encoding, y los fin de
+    # línea \r\n y \r pasan a \n con open, pero no en sys.stdin (salvo en Windows)
+    with open(args[1]) if len(args) == 2 else sys.stdin as input_file:
+        read = input_file.buffer.read1
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(input_file.encoding)(input_file.errors),
+            translate=input_file is not sys.stdin or os.name == "nt")
+        pending = ""
+        while True:
+            data = read(CHUNK_SIZE)
+            lines = (pending + decoder.decode(data, final=not data)).split("\n")
+            pending = lines.pop()
+            matched = [line for line in lines if match(line)]
             if matched:
-                print(line, end="")
+                stdout_write("\n".join(matched) + "\n")
+            if not data:
+                break
+        # La última línea, si no termina con "\n"
+        if pending and match(pending):
+            stdout_write(pending)